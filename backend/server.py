@@ -1,15 +1,37 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import Callable, Dict, Any, List, Optional, Union
 import os
 from dotenv import load_dotenv
 import asyncio
+import threading
+import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
-import json
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+import orjson
+import ahocorasick
+import hashlib
+import httpx
+from aiolimiter import AsyncLimiter
+
+# Optional dependencies - resolved once at startup so a missing library doesn't stop the API
+try:
+    from emergentintegrations.llm.chat import LlmChat, UserMessage
+    _HAS_LLM = True
+except ImportError:
+    _HAS_LLM = False
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
 
 # Load environment variables
 load_dotenv()
@@ -35,15 +57,106 @@ app.add_middleware(
 
 # MongoDB connection
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    maxPoolSize=50,
+    minPoolSize=10,
+    serverSelectionTimeoutMS=3000,
+    waitQueueTimeoutMS=2000,
+    retryWrites=True,
+    uuidRepresentation="standard"
+)
 db = client.krishi_officer
 
+# Semantic cache configuration
+SEMANTIC_CACHE_MODEL = os.getenv(
+    "SEMANTIC_CACHE_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+# Each worker process keeps its own index; reloading picks up entries stored by other workers
+SEMANTIC_CACHE_RELOAD_SECONDS = float(os.getenv("SEMANTIC_CACHE_RELOAD_SECONDS", "300"))
+# Initial row capacity of the in-memory index; it doubles when full
+SEMANTIC_INDEX_CHUNK = 1024
+
+# Cache lifetime in seconds per detected intent - volatile topics expire sooner
+SEMANTIC_CACHE_TTL = {
+    "weather": 3 * 3600,
+    "market_info": 12 * 3600,
+    "pest_disease": 3 * 86400,
+    "crop_query": 7 * 86400,
+    "finance_scheme": 30 * 86400,
+    "general": 86400,
+}
+
+# Analyses below this confidence skip the advisor and return a retry hint
+MIN_ADVICE_CONFIDENCE = 0.3
+DEGRADED_ADVICE_MESSAGE = (
+    "ക്ഷമിക്കണം, നിങ്ങളുടെ ചോദ്യം ഇപ്പോൾ മനസ്സിലാക്കാൻ കഴിഞ്ഞില്ല. "
+    "ദയവായി കുറച്ച് സമയത്തിന് ശേഷം വീണ്ടും ശ്രമിക്കുക."
+)
+
+# Exact-match LLM response cache lifetime
+LLM_CACHE_TTL = 7 * 86400
+LLM_MODEL = ("openai", "gpt-4o-mini")
+
+# Shared connection pool for outbound LLM requests
+llm_http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+
+# Bound outbound LLM concurrency and request rate to stay under provider limits.
+# These limits apply per worker process: with WEB_CONCURRENCY > 1 divide them by the worker count
+_LLM_SEM = asyncio.Semaphore(int(os.getenv("LLM_CONCURRENCY", "20")))
+_LLM_LIMITER = AsyncLimiter(max_rate=int(os.getenv("LLM_RPM", "500")), time_period=60)
+
 # Pydantic Models
 class FarmerQuery(BaseModel):
     text: str = Field(..., description="Malayalam text from farmer")
     query_type: Optional[str] = Field("general", description="Type of query")
     location: Optional[str] = Field(None, description="Farm location")
     farmer_id: Optional[str] = Field(None, description="Farmer identifier")
+    persist: bool = Field(True, description="Store the query and its result in the database")
+
+class TranslationRequest(BaseModel):
+    text: str
+    source_lang: str = "ml"
+    target_lang: str = "en"
+
+class TranslationResponse(BaseModel):
+    success: bool
+    original_text: str
+    translated_text: Optional[str] = None
+    method: Optional[str] = None
+    error: Optional[str] = None
+
+class QueryAnalysis(BaseModel):
+    intent: str = "general"
+    crop: Optional[str] = None
+    location: Optional[str] = None
+    # The prompt only promises "urgency": number, so accept floats as well as ints
+    urgency: Optional[Union[int, float]] = None
+    concepts: Optional[List[str]] = []
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+class AdviceResult(BaseModel):
+    success: bool
+    advice: Optional[str] = None
+    agent: Optional[str] = None
+    intent_handled: Optional[str] = None
+    skipped: bool = False
+    error: Optional[str] = None
+
+class AgentResponses(BaseModel):
+    translation: TranslationResponse
+    analysis: QueryAnalysis
+    advice: AdviceResult
+
+class FarmerQueryBatch(BaseModel):
+    # Each query runs its own LLM pipeline concurrently, so cap how many one request can start
+    queries: List[FarmerQuery] = Field(..., max_length=16, description="Farmer queries to process together")
 
 class QueryResponse(BaseModel):
     id: str
@@ -51,21 +164,318 @@ class QueryResponse(BaseModel):
     translated_text: Optional[str] = None
     intent: Optional[str] = None
     confidence: Optional[float] = None
-    agent_responses: Dict[str, Any] = {}
+    agent_responses: Optional[AgentResponses] = None
     recommendations: List[str] = []
     timestamp: datetime
     status: str = "processing"
 
-class TranslationRequest(BaseModel):
-    text: str
-    source_lang: str = "ml"
-    target_lang: str = "en"
+# Malayalam to English agricultural lexicon
+_ML_EN_LEXICON = {
+    "നെല്ല്": "rice",
+    "കപ്പ": "tapioca",
+    "തെങ്ങ്": "coconut",
+    "കുരുമുളക്": "pepper",
+    "ഏലം": "cardamom",
+    "റബ്ബർ": "rubber",
+    "പയർ": "beans",
+    "വിത്ത്": "seed",
+    "നടുക": "plant",
+    "കൊയ്ത്ത്": "harvest",
+    "വളം": "fertilizer",
+    "രോഗം": "disease",
+    "കീടം": "pest",
+    "പുഴു": "worm",
+    "മഴ": "rain",
+    "വരൾച്ച": "drought",
+    "എന്താണ്": "what is",
+    "എങ്ങനെ": "how",
+    "എപ്പോൾ": "when",
+    "എവിടെ": "where",
+    "സഹായം": "help",
+    "ചികിത്സ": "treatment",
+    "മരുന്ന്": "medicine"
+}
 
-class TranslationResponse(BaseModel):
-    success: bool
-    original_text: str
-    translated_text: Optional[str] = None
-    error: Optional[str] = None
+def _build_lexicon_automaton(lexicon: Dict[str, str]):
+    """Build an Aho-Corasick automaton mapping each term to (length, translation)"""
+    automaton = ahocorasick.Automaton()
+    for malayalam, english in lexicon.items():
+        automaton.add_word(malayalam, (len(malayalam), english))
+    automaton.make_automaton()
+    return automaton
+
+_ML_AUTOMATON = _build_lexicon_automaton(_ML_EN_LEXICON)
+
+# Write Batching
+class AsyncBatcher:
+    def __init__(self, collection, interval: float = 0.01, max_batch: int = 500):
+        self.collection = collection
+        self.interval = interval
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self):
+        """Start the background drain loop"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, operation):
+        """Queue a write operation and wait until its batch has been written"""
+        if self._task is None:
+            await self.collection.bulk_write([operation])
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((operation, future))
+        await future
+
+    async def _run(self):
+        while not self._stopping:
+            await asyncio.sleep(self.interval)
+            while not self._queue.empty():
+                await self._drain()
+
+    async def _drain(self):
+        """Write up to max_batch queued operations with a single unordered bulk_write"""
+        batch = []
+        while not self._queue.empty() and len(batch) < self.max_batch:
+            batch.append(self._queue.get_nowait())
+        if not batch:
+            return
+
+        failed = {}
+        try:
+            await self.collection.bulk_write([operation for operation, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            failed = {error["index"]: error.get("errmsg", "write failed") for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            failed = {index: str(e) for index in range(len(batch))}
+
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(RuntimeError(failed[index]))
+            else:
+                future.set_result(None)
+
+    async def flush(self):
+        """Stop the drain loop and write any remaining operations"""
+        if self._task is not None:
+            # Let the loop finish its current bulk_write; cancelling it mid-write would drop the batch
+            self._stopping = True
+            await self._task
+            self._task = None
+        while not self._queue.empty():
+            await self._drain()
+
+# Batches concurrent db.queries writes into shared bulk_write round-trips
+query_writer = AsyncBatcher(db.queries)
+
+# Semantic Cache
+class SemanticCache:
+    def __init__(self, collection, model_name: str, threshold: float):
+        self.collection = collection
+        self.model_name = model_name
+        self.threshold = threshold
+        self.enabled = _HAS_NUMPY
+        self._model = None
+        # _encode runs in worker threads; concurrent first requests must load the model only once
+        self._model_lock = threading.Lock()
+        # Index rows [0, _size) of a preallocated matrix; lists are replaced, never reordered in place,
+        # so a lookup awaiting Mongo can keep using the ones it started with
+        self._ids: List[str] = []
+        self._expiry: List[float] = []
+        self._matrix = None
+        self._size = 0
+        self._loaded_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _load_model(self):
+        """Load (and on a cold host download) the embedding model once (blocking, run in a thread)"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    # Import here to avoid startup issues if library not installed
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _encode(self, text: str):
+        """Compute a normalized sentence embedding (blocking, run in a thread)"""
+        return self._load_model().encode(text, normalize_embeddings=True)
+
+    async def load(self):
+        """Load the embedding model ahead of the first query, disabling the cache if it is unavailable"""
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self._load_model)
+        except Exception as e:
+            logger.error(f"Semantic cache disabled: {str(e)}")
+            self.enabled = False
+
+    async def embed(self, text: str):
+        """Embed query text, disabling the cache if the model is unavailable"""
+        if not self.enabled:
+            return None
+        try:
+            return await asyncio.to_thread(self._encode, text)
+        except Exception as e:
+            logger.error(f"Semantic cache disabled: {str(e)}")
+            self.enabled = False
+            return None
+
+    def _append(self, cache_id: str, expires_at: float, vector):
+        """Add a row to the index, pruning expired rows or doubling capacity when full"""
+        if self._matrix is None:
+            self._matrix = np.empty((SEMANTIC_INDEX_CHUNK, vector.shape[0]), dtype=np.float32)
+        elif self._size == self._matrix.shape[0]:
+            self._prune(time.time())
+            if self._size == self._matrix.shape[0]:
+                grown = np.empty((2 * self._size, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix
+                self._matrix = grown
+        self._matrix[self._size] = vector
+        self._ids.append(cache_id)
+        self._expiry.append(expires_at)
+        self._size += 1
+
+    def _prune(self, now: float):
+        """Drop expired rows from the index"""
+        keep = [index for index in range(self._size) if self._expiry[index] > now]
+        if len(keep) == self._size:
+            return
+        self._matrix[:len(keep)] = self._matrix[keep]
+        self._ids = [self._ids[index] for index in keep]
+        self._expiry = [self._expiry[index] for index in keep]
+        self._size = len(keep)
+
+    async def _load_index(self):
+        """(Re)build the in-memory vector index from unexpired Mongo entries when it is stale"""
+        if time.monotonic() - self._loaded_at < SEMANTIC_CACHE_RELOAD_SECONDS:
+            return
+        async with self._lock:
+            if time.monotonic() - self._loaded_at < SEMANTIC_CACHE_RELOAD_SECONDS:
+                return
+            cursor = self.collection.find(
+                {"expires_at": {"$gt": datetime.now(timezone.utc)}},
+                {"_id": 0, "cache_id": 1, "embedding": 1, "expires_at": 1}
+            )
+            self._ids, self._expiry, self._matrix, self._size = [], [], None, 0
+            async for doc in cursor:
+                self._append(
+                    doc["cache_id"],
+                    doc["expires_at"].replace(tzinfo=timezone.utc).timestamp(),
+                    np.asarray(doc["embedding"], dtype=np.float32)
+                )
+            self._loaded_at = time.monotonic()
+
+    async def lookup(self, embedding) -> Optional[Dict[str, Any]]:
+        """Return the cached response of the nearest neighbour above the similarity threshold
+
+        Cache errors are logged and treated as a miss so they never fail the query.
+        """
+        try:
+            await self._load_index()
+            if self._size == 0:
+                return None
+
+            ids, expiry = self._ids, self._expiry
+            scores = self._matrix[:self._size] @ np.asarray(embedding, dtype=np.float32)
+            now = time.time()
+            for idx in np.argsort(scores)[::-1]:
+                if scores[idx] < self.threshold:
+                    return None
+                if expiry[idx] <= now:
+                    continue
+                doc = await self.collection.find_one({"cache_id": ids[idx]}, {"_id": 0, "response": 1})
+                if doc:
+                    return doc["response"]
+        except Exception as e:
+            logger.error(f"Semantic cache lookup error: {str(e)}")
+        return None
+
+    async def store(self, embedding, intent: Optional[str], response: Dict[str, Any]):
+        """Persist a completed response and add it to the in-memory index; errors are logged, not raised"""
+        ttl = SEMANTIC_CACHE_TTL.get(intent or "general", SEMANTIC_CACHE_TTL["general"])
+        cache_id = str(uuid.uuid4())
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+
+        try:
+            vector = np.asarray(embedding, dtype=np.float32)
+            await self.collection.insert_one({
+                "cache_id": cache_id,
+                "embedding": vector.tolist(),
+                "intent": intent,
+                "response": response,
+                "expires_at": expires_at
+            })
+
+            async with self._lock:
+                self._append(cache_id, expires_at.timestamp(), vector)
+        except Exception as e:
+            logger.error(f"Semantic cache store error: {str(e)}")
+
+# LLM Helpers
+async def _cached_chat(system_message: str, user_text: str, model=LLM_MODEL, api_key: Optional[str] = None,
+                       use_cache: bool = True, parse: Optional[Callable[[str], Any]] = None) -> Any:
+    """Send a one-shot prompt, reusing the stored response for identical prompts unless use_cache is False
+
+    If parse is given, its result is returned instead of the raw response and only responses it
+    accepts are cached; its exceptions propagate to the caller.
+    """
+    provider, model_name = model
+    prompt_hash = hashlib.sha256(
+        (system_message + "\x00" + user_text + "\x00" + provider + "/" + model_name).encode()
+    ).hexdigest()
+
+    if use_cache:
+        try:
+            cached = await db.llm_cache.find_one({"_id": prompt_hash}, {"response": 1})
+        except Exception as e:
+            logger.error(f"LLM cache read error: {str(e)}")
+            cached = None
+        if cached:
+            if parse is None:
+                return cached["response"]
+            try:
+                return parse(cached["response"])
+            except Exception:
+                # Cached before it was validated; drop it and ask the model again
+                try:
+                    await db.llm_cache.delete_one({"_id": prompt_hash})
+                except Exception as e:
+                    logger.error(f"LLM cache delete error: {str(e)}")
+
+    if not _HAS_LLM:
+        raise RuntimeError("emergentintegrations is not installed")
+
+    # LlmChat keeps per-session message history, so a fresh instance is built per
+    # prompt; connection reuse comes from the shared llm_http_client pool instead
+    chat = LlmChat(
+        api_key=api_key,
+        session_id=uuid.uuid4().hex,
+        system_message=system_message
+    ).with_model(provider, model_name)
+
+    async with _LLM_SEM, _LLM_LIMITER:
+        response = await chat.send_message(UserMessage(text=user_text))
+    result = parse(response) if parse is not None else response
+
+    if use_cache:
+        try:
+            await db.llm_cache.update_one(
+                {"_id": prompt_hash},
+                {"$set": {"response": response, "ts": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"LLM cache write error: {str(e)}")
+
+    return result
 
 # Agent Classes
 class QueryUnderstandingAgent:
@@ -73,13 +483,9 @@ class QueryUnderstandingAgent:
         self.agent_name = "Query Understanding Agent"
         self.llm_key = os.getenv("EMERGENT_LLM_KEY")
         
-    async def analyze_query(self, text: str, translated_text: str) -> Dict[str, Any]:
+    async def analyze_query(self, text: str, translated_text: str, use_cache: bool = True) -> Dict[str, Any]:
         """Analyze farmer query to understand intent and extract information"""
         try:
-            # Import here to avoid startup issues if library not installed
-            from emergentintegrations.llm.chat import LlmChat, UserMessage
-            
-            session_id = str(uuid.uuid4())
             system_message = """You are an agricultural expert AI that analyzes farmer queries. 
             Given a Malayalam farmer's query (and its English translation), analyze and extract:
             1. Intent: crop_query, pest_disease, weather, finance_scheme, market_info, general
@@ -98,23 +504,14 @@ class QueryUnderstandingAgent:
                 "confidence": number (0-1)
             }"""
             
-            chat = LlmChat(
-                api_key=self.llm_key,
-                session_id=session_id,
-                system_message=system_message
-            ).with_model("openai", "gpt-4o-mini")
-            
-            user_message = UserMessage(
-                text=f"Malayalam Query: {text}\nEnglish Translation: {translated_text}\n\nAnalyze this agricultural query:"
-            )
-            
-            response = await chat.send_message(user_message)
+            user_text = f"Malayalam Query: {text}\nEnglish Translation: {translated_text}\n\nAnalyze this agricultural query:"
             
-            # Parse JSON response
+            # Parse and validate JSON response in a single pass; invalid replies are never cached
             try:
-                analysis = json.loads(response)
-                return analysis
-            except json.JSONDecodeError:
+                analysis = await _cached_chat(system_message, user_text, api_key=self.llm_key,
+                                              use_cache=use_cache, parse=QueryAnalysis.model_validate_json)
+                return analysis.model_dump()
+            except ValidationError:
                 # Fallback parsing
                 return {
                     "intent": "general",
@@ -140,6 +537,28 @@ class QueryUnderstandingAgent:
 class TranslationAgent:
     def __init__(self):
         self.agent_name = "Translation Agent"
+        self._automaton = _ML_AUTOMATON
+        
+    def _replace_terms(self, text: str):
+        """Replace lexicon terms in a single scan, preferring leftmost then longest matches"""
+        matches = sorted(
+            ((end - length + 1, end + 1, english) for end, (length, english) in self._automaton.iter(text)),
+            key=lambda match: (match[0], -match[1])
+        )
+        
+        parts = []
+        position = 0
+        replacements = 0
+        for start, end, english in matches:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(english)
+            position = end
+            replacements += 1
+        parts.append(text[position:])
+        
+        return "".join(parts), replacements
         
     async def translate_malayalam(self, text: str) -> Dict[str, Any]:
         """Translate Malayalam to English - using Google Translate free tier"""
@@ -147,39 +566,11 @@ class TranslationAgent:
             # For now, implementing a simple keyword-based translation for common agricultural terms
             # This will be replaced with actual Google Translate API integration
             
-            malayalam_to_english = {
-                "നെല്ല്": "rice",
-                "കപ്പ": "tapioca", 
-                "തെങ്ങ്": "coconut",
-                "കുരുമുളക്": "pepper",
-                "ഏലം": "cardamom",
-                "റബ്ബർ": "rubber",
-                "പയർ": "beans",
-                "വിത്ത്": "seed",
-                "നടുക": "plant",
-                "കൊയ്ത്ത്": "harvest",
-                "വളം": "fertilizer",
-                "രോഗം": "disease",
-                "കീടം": "pest",
-                "പുഴു": "worm",
-                "മഴ": "rain",
-                "വരൾച്ച": "drought",
-                "എന്താണ്": "what is",
-                "എങ്ങനെ": "how",
-                "എപ്പോൾ": "when",
-                "എവിടെ": "where",
-                "സഹായം": "help",
-                "ചികിത്സ": "treatment",
-                "മരുന്ന്": "medicine"
-            }
-            
-            # Simple translation by replacing known terms
-            translated = text
-            for malayalam, english in malayalam_to_english.items():
-                translated = translated.replace(malayalam, english)
+            # Replace known terms in a single pass over the text
+            translated, replacements = self._replace_terms(text)
             
             # If no translation occurred, use a generic approach
-            if translated == text:
+            if replacements == 0:
                 translated = f"Agricultural query: {text}"
             
             return {
@@ -203,12 +594,10 @@ class AgricultureAdvisorAgent:
         self.agent_name = "Agriculture Advisor Agent"
         self.llm_key = os.getenv("EMERGENT_LLM_KEY")
         
-    async def provide_advice(self, query_analysis: Dict[str, Any], translated_text: str) -> Dict[str, Any]:
+    async def provide_advice(self, query_analysis: Dict[str, Any], translated_text: str,
+                             use_cache: bool = True) -> Dict[str, Any]:
         """Provide agricultural advice based on query analysis"""
         try:
-            from emergentintegrations.llm.chat import LlmChat, UserMessage
-            
-            session_id = str(uuid.uuid4())
             system_message = """You are an expert agricultural advisor specializing in Kerala and South Indian farming practices. 
             Provide practical, actionable advice for farmers. Consider local climate, crops, and farming methods.
             
@@ -221,12 +610,6 @@ class AgricultureAdvisorAgent:
             
             Keep advice simple, practical, and culturally appropriate for Malayalam-speaking farmers."""
             
-            chat = LlmChat(
-                api_key=self.llm_key,
-                session_id=session_id,
-                system_message=system_message
-            ).with_model("openai", "gpt-4o-mini")
-            
             intent = query_analysis.get("intent", "general")
             crop = query_analysis.get("crop", "")
             urgency = query_analysis.get("urgency", 3)
@@ -245,8 +628,7 @@ class AgricultureAdvisorAgent:
             5. Expected outcomes
             """
             
-            user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            response = await _cached_chat(system_message, prompt, api_key=self.llm_key, use_cache=use_cache)
             
             return {
                 "success": True,
@@ -268,35 +650,86 @@ class AgentOrchestrator:
         self.translation_agent = TranslationAgent()
         self.query_agent = QueryUnderstandingAgent()
         self.advisor_agent = AgricultureAdvisorAgent()
+        self.semantic_cache = SemanticCache(db.query_cache, SEMANTIC_CACHE_MODEL, SEMANTIC_CACHE_THRESHOLD)
+        
+    async def _persist(self, query: FarmerQuery, query_doc: Dict[str, Any]):
+        """Upsert the final query document unless the caller opted out of persistence"""
+        if query.persist:
+            await query_writer.submit(UpdateOne({"id": query_doc["id"]}, {"$set": query_doc}, upsert=True))
         
     async def process_farmer_query(self, query: FarmerQuery) -> QueryResponse:
         """Process farmer query through multiple agents"""
+        response = None
+        async for event, payload in self.process_farmer_query_stream(query):
+            if event == "result":
+                response = payload
+        return response
+        
+    async def process_farmer_query_stream(self, query: FarmerQuery):
+        """Process farmer query, yielding (event, payload) pairs as each agent finishes"""
         query_id = str(uuid.uuid4())
         timestamp = datetime.now(timezone.utc)
         
-        # Store initial query
+        # Base document, written once together with the final result
         query_doc = {
             "id": query_id,
             "original_text": query.text,
             "query_type": query.query_type,
             "location": query.location,
             "farmer_id": query.farmer_id,
-            "timestamp": timestamp,
-            "status": "processing"
+            "timestamp": timestamp
         }
         
         try:
-            await db.queries.insert_one(query_doc)
-            
-            # Step 1: Translate Malayalam to English
-            translation_result = await self.translation_agent.translate_malayalam(query.text)
+            # Step 1: Translate and embed the query concurrently - neither depends on the other.
+            # Queries that opt out of persistence skip every cache, so their text never reaches Mongo
+            if query.persist:
+                translation_result, embedding = await asyncio.gather(
+                    self.translation_agent.translate_malayalam(query.text),
+                    self.semantic_cache.embed(query.text)
+                )
+            else:
+                translation_result = await self.translation_agent.translate_malayalam(query.text)
+                embedding = None
             translated_text = translation_result.get("translated_text", query.text)
-            
-            # Step 2: Analyze query intent
-            query_analysis = await self.query_agent.analyze_query(query.text, translated_text)
-            
-            # Step 3: Get agricultural advice
-            advice_result = await self.advisor_agent.provide_advice(query_analysis, translated_text)
+            yield "translation", translation_result
+            
+            # Step 2: Serve semantically equivalent queries from cache
+            cached = await self.semantic_cache.lookup(embedding) if embedding is not None else None
+            if cached:
+                # Reuse the neighbour's analysis and advice, but keep this query's own translation
+                cached = {
+                    **cached,
+                    "translated_text": translated_text,
+                    "agent_responses": {**cached.get("agent_responses", {}), "translation": translation_result}
+                }
+                await self._persist(query, {**query_doc, **cached, "status": "completed", "cache_hit": True})
+                yield "result", QueryResponse(
+                    id=query_id,
+                    original_text=query.text,
+                    timestamp=timestamp,
+                    status="completed",
+                    **cached
+                )
+                return
+            
+            # Step 3: Analyze query intent
+            query_analysis = await self.query_agent.analyze_query(query.text, translated_text, use_cache=query.persist)
+            yield "analysis", query_analysis
+            
+            # Step 4: Get agricultural advice, unless the analysis is too unreliable to act on
+            degraded = bool(query_analysis.get("error")) or (query_analysis.get("confidence") or 0) < MIN_ADVICE_CONFIDENCE
+            if degraded:
+                advice_result = {
+                    "success": False,
+                    "advice": DEGRADED_ADVICE_MESSAGE,
+                    "agent": self.advisor_agent.agent_name,
+                    "skipped": True
+                }
+            else:
+                advice_result = await self.advisor_agent.provide_advice(query_analysis, translated_text,
+                                                                         use_cache=query.persist)
+            yield "advice", advice_result
             
             # Compile response
             agent_responses = {
@@ -307,25 +740,28 @@ class AgentOrchestrator:
             
             # Extract recommendations
             recommendations = []
-            if advice_result.get("success"):
+            if advice_result.get("success") or degraded:
                 recommendations.append(advice_result.get("advice", ""))
             
-            # Update database
+            result_status = "degraded" if degraded else "completed"
+            
+            # Store the completed query
             update_doc = {
                 "translated_text": translated_text,
                 "intent": query_analysis.get("intent"),
                 "confidence": query_analysis.get("confidence"),
                 "agent_responses": agent_responses,
                 "recommendations": recommendations,
-                "status": "completed"
+                "status": result_status
             }
             
-            await db.queries.update_one(
-                {"id": query_id},
-                {"$set": update_doc}
-            )
+            await self._persist(query, {**query_doc, **update_doc})
+            
+            if embedding is not None and advice_result.get("success"):
+                cached_doc = {k: v for k, v in update_doc.items() if k != "status"}
+                await self.semantic_cache.store(embedding, query_analysis.get("intent"), cached_doc)
             
-            return QueryResponse(
+            yield "result", QueryResponse(
                 id=query_id,
                 original_text=query.text,
                 translated_text=translated_text,
@@ -334,19 +770,16 @@ class AgentOrchestrator:
                 agent_responses=agent_responses,
                 recommendations=recommendations,
                 timestamp=timestamp,
-                status="completed"
+                status=result_status
             )
             
         except Exception as e:
             logger.error(f"Query processing error: {str(e)}")
             
-            # Update status to error
-            await db.queries.update_one(
-                {"id": query_id},
-                {"$set": {"status": "error", "error": str(e)}}
-            )
+            # Store the query with its error status
+            await self._persist(query, {**query_doc, "status": "error", "error": str(e)})
             
-            return QueryResponse(
+            yield "result", QueryResponse(
                 id=query_id,
                 original_text=query.text,
                 timestamp=timestamp,
@@ -356,6 +789,53 @@ class AgentOrchestrator:
 # Initialize orchestrator
 orchestrator = AgentOrchestrator()
 
+@app.on_event("startup")
+async def warm_mongo_pool():
+    """Fail fast if MongoDB is unreachable and open pooled connections before the first request"""
+    await db.command("ping")
+
+@app.on_event("startup")
+async def configure_llm_client():
+    """Route LLM provider calls through the shared HTTP connection pool"""
+    try:
+        import litellm
+        litellm.aclient_session = llm_http_client
+    except ImportError:
+        logger.warning("litellm not installed, LLM calls will use default HTTP clients")
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    """Close pooled LLM connections"""
+    await llm_http_client.aclose()
+
+@app.on_event("startup")
+async def load_semantic_cache_model():
+    """Load the embedding model before serving so no request waits for the load or download"""
+    await orchestrator.semantic_cache.load()
+
+@app.on_event("startup")
+async def start_query_writer():
+    """Start batching query writes"""
+    query_writer.start()
+
+@app.on_event("shutdown")
+async def flush_query_writer():
+    """Write any queued query documents before exit"""
+    await query_writer.flush()
+
+@app.on_event("startup")
+async def create_indexes():
+    """Create collection indexes"""
+    try:
+        await db.queries.create_index("id", unique=True)
+        await db.queries.create_index([("timestamp", -1)])
+        await db.queries.create_index("status")
+        await db.query_cache.create_index("expires_at", expireAfterSeconds=0)
+        await db.query_cache.create_index("cache_id", unique=True)
+        await db.llm_cache.create_index("ts", expireAfterSeconds=LLM_CACHE_TTL)
+    except Exception as e:
+        logger.error(f"Index creation error: {str(e)}")
+
 # API Endpoints
 @app.post("/api/farmer-query", response_model=QueryResponse)
 async def process_farmer_query(query: FarmerQuery):
@@ -370,17 +850,42 @@ async def process_farmer_query(query: FarmerQuery):
             detail=f"Error processing query: {str(e)}"
         )
 
+@app.post("/api/farmer-query/batch", response_model=List[QueryResponse])
+async def process_farmer_query_batch(batch: FarmerQueryBatch):
+    """Process several farmer queries concurrently"""
+    try:
+        return await asyncio.gather(*[orchestrator.process_farmer_query(query) for query in batch.queries])
+    except Exception as e:
+        logger.error(f"Batch API error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing batch: {str(e)}"
+        )
+
+@app.post("/api/farmer-query/stream")
+async def stream_farmer_query(query: FarmerQuery):
+    """Stream each agent's result for a farmer's query as server-sent events"""
+    async def event_stream():
+        async for event, payload in orchestrator.process_farmer_query_stream(query):
+            if isinstance(payload, BaseModel):
+                data = payload.model_dump_json()
+            else:
+                data = orjson.dumps(payload, default=str).decode()
+            yield f"event: {event}\ndata: {data}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.post("/api/translate", response_model=TranslationResponse)
 async def translate_text(request: TranslationRequest):
     """Direct translation endpoint"""
     try:
-        translation_agent = TranslationAgent()
-        result = await translation_agent.translate_malayalam(request.text)
+        result = await orchestrator.translation_agent.translate_malayalam(request.text)
         
         return TranslationResponse(
             success=result["success"],
             original_text=result["original_text"],
             translated_text=result.get("translated_text"),
+            method=result.get("method"),
             error=result.get("error")
         )
     except Exception as e:
@@ -391,16 +896,44 @@ async def translate_text(request: TranslationRequest):
             error=str(e)
         )
 
+# Top-level fields of a stored query that ?fields= may select
+_QUERY_FIELDS = frozenset({
+    "id", "original_text", "query_type", "location", "farmer_id", "timestamp", "translated_text",
+    "intent", "confidence", "agent_responses", "recommendations", "status", "cache_hit", "error"
+})
+
 @app.get("/api/queries/{query_id}")
-async def get_query(query_id: str):
-    """Get query by ID"""
+async def get_query(query_id: str, request: Request, response: Response, fields: Optional[str] = None):
+    """Get query by ID, optionally limited to a comma-separated list of fields"""
     try:
-        query = await db.queries.find_one({"id": query_id})
+        # Exclude the MongoDB _id field server-side
+        projection = {"_id": 0}
+        if fields:
+            requested = {field.strip() for field in fields.split(",") if field.strip()}
+            unknown = requested - _QUERY_FIELDS
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+            projection["id"] = 1
+            projection.update(dict.fromkeys(requested, 1))
+        
+        query = await db.queries.find_one({"id": query_id}, projection)
         if not query:
             raise HTTPException(status_code=404, detail="Query not found")
         
-        # Remove MongoDB _id field
-        query.pop("_id", None)
+        # Stored queries don't change once finished, so polling clients can revalidate cheaply
+        digest = hashlib.blake2b(orjson.dumps(query, default=str, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+        etag = f'"{digest}"'
+        headers = {"ETag": etag}
+        if query.get("status") == "completed":
+            headers["Cache-Control"] = "private, max-age=300"
+        
+        # Weak comparison (RFC 9110): W/ prefixes are ignored and * matches any current representation
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        response.headers.update(headers)
         return query
     except HTTPException:
         raise
@@ -411,19 +944,27 @@ async def get_query(query_id: str):
             detail=f"Error retrieving query: {str(e)}"
         )
 
+# Health payload is rebuilt at most once per second for frequent load balancer probes
+_HEALTH_CACHE = {"t": 0.0, "payload": b""}
+
 @app.get("/api/health")
+@app.head("/api/health", include_in_schema=False)  # Lets clients warm connections cheaply
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "Digital Krishi Officer API",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "agents": {
-            "translation": "active",
-            "query_understanding": "active", 
-            "agriculture_advisor": "active"
-        }
-    }
+    now = time.monotonic()
+    if now - _HEALTH_CACHE["t"] > 1.0:
+        _HEALTH_CACHE["payload"] = orjson.dumps({
+            "status": "healthy",
+            "service": "Digital Krishi Officer API",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "agents": {
+                "translation": "active",
+                "query_understanding": "active", 
+                "agriculture_advisor": "active"
+            }
+        })
+        _HEALTH_CACHE["t"] = now
+    return Response(content=_HEALTH_CACHE["payload"], media_type="application/json")
 
 @app.get("/")
 async def root():
@@ -437,4 +978,13 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=8001,
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
+        # One worker by default: LLM limits, the semantic index and the write batcher are per process
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
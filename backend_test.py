@@ -6,65 +6,307 @@ Tests all backend functionality including agent coordination, translation, and d
 
 import asyncio
 import aiohttp
+import collections
 import json
 import time
+import functools
+import itertools
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 import os
+import random
+import sys
 from dotenv import load_dotenv
 
+# orjson is optional; fall back to the stdlib encoder/decoder when it isn't installed
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+    
+    def _json_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+    
+    def _json_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# uvloop is optional (not available on Windows); the default asyncio loop is used without it
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
-# Get backend URL from frontend .env file
-def get_backend_url():
-    """Get backend URL from frontend environment"""
+def _read_frontend_env() -> Optional[str]:
+    """Read REACT_APP_BACKEND_URL from the frontend .env file"""
     try:
         with open('/app/frontend/.env', 'r') as f:
             for line in f:
                 if line.startswith('REACT_APP_BACKEND_URL='):
                     return line.split('=', 1)[1].strip()
-    except:
+    except OSError:
         pass
-    return "http://localhost:8001"  # fallback
+    return None
+
+# Submit farmer queries through /api/farmer-query/batch in a single request
+BATCH_ENDPOINT_ENABLED = os.getenv("KRISHI_BATCH", "0") == "1"
+
+@functools.lru_cache(maxsize=1)
+def get_backend_url():
+    """Get backend URL from the environment, then the frontend .env file"""
+    return os.getenv("REACT_APP_BACKEND_URL") or _read_frontend_env() or "http://localhost:8001"  # fallback
+
+_REQ_HEALTH = frozenset({"status", "service", "timestamp", "agents"})
+_REQ_TRANSLATE = frozenset({"success", "original_text", "translated_text"})
+_REQ_QUERY = frozenset({"id", "original_text", "timestamp", "status"})
+_EXPECTED_AGENTS = frozenset({"translation", "query_understanding", "agriculture_advisor"})
+_REQUIRED_AGENT_RESPONSES = frozenset({"translation", "analysis", "advice"})
+
+# Caps on error text embedded in log lines and on payloads kept with each result
+_ERROR_BODY_MAX = 2048
+_RESPONSE_DATA_MAX = 4096
+# Failed results kept in memory; the full record goes to the NDJSON log
+_MAX_FAILURES = 100
+
+# Failures worth retrying; HTTP errors and validation failures never are. A POST is only retried
+# when the connection failed before it was sent - after a timeout or disconnect the server may
+# already be running the query, and a retry would start (and store) a duplicate
+_CONNECT_ERRORS = (aiohttp.ClientConnectorError,)
+_TRANSIENT_ERRORS = _CONNECT_ERRORS + (aiohttp.ServerDisconnectedError, asyncio.TimeoutError)
+
+_PASS_FAIL = {True: "✅ PASS ", False: "❌ FAIL "}
+_SUITE_NAMES = ("Health Check", "Translation", "Multi-Agent Processing", "Database Storage", "Error Handling")
+
+def _decode_body(status: int, raw: bytes) -> Any:
+    """Parse a 200 body as JSON; otherwise return the truncated error text"""
+    if status == 200:
+        return _json_loads(raw)
+    return raw[:_ERROR_BODY_MAX].decode("utf-8", "replace")
+
+def _truncate(data: Any, max_bytes: int = _RESPONSE_DATA_MAX) -> Any:
+    """Return data unchanged if it serializes within max_bytes, else a truncated JSON string"""
+    encoded = data.encode() if isinstance(data, str) else _json_dumps(data)
+    if len(encoded) <= max_bytes:
+        return data
+    return encoded[:max_bytes].decode("utf-8", "ignore") + "...[truncated]"
 
-BASE_URL = get_backend_url()
-API_BASE_URL = f"{BASE_URL}/api"
+# Pure response validators - called after the response body is read and its connection released
+
+def _validate_health(data: Dict[str, Any]) -> Tuple[bool, str]:
+    """Check the health payload structure and that every agent is active"""
+    missing_fields = _REQ_HEALTH - data.keys()
+    if missing_fields:
+        return False, f"Missing fields: {sorted(missing_fields)}"
+    
+    agents = data.get("agents", {})
+    inactive_agents = [agent for agent in _EXPECTED_AGENTS if agents.get(agent) != "active"]
+    if inactive_agents:
+        return False, f"Inactive agents: {sorted(inactive_agents)}"
+    
+    return True, "All systems healthy"
+
+def _validate_translation(data: Dict[str, Any]) -> Tuple[bool, str]:
+    """Check a /translate response"""
+    missing_fields = _REQ_TRANSLATE - data.keys()
+    if missing_fields:
+        return False, f"Missing fields: {sorted(missing_fields)}"
+    
+    if data.get("success") and data.get("translated_text"):
+        return True, f"Translated: '{data['translated_text']}'"
+    
+    return False, f"Translation failed: {data.get('error', 'Unknown error')}"
+
+def _validate_farmer_query(data: Dict[str, Any],
+                           accepted_intents: Optional[FrozenSet[str]] = None) -> Tuple[bool, str, Dict[str, Any]]:
+    """Check a multi-agent farmer-query response; also returns the query id and pipeline translation"""
+    info = {"query_id": None, "translation": {}}
+    
+    missing_fields = _REQ_QUERY - data.keys()
+    if missing_fields:
+        return False, f"Missing fields: {sorted(missing_fields)}", info
+    
+    info["query_id"] = data.get("id")
+    
+    # Check if processing was successful
+    if data.get("status") == "error":
+        return False, "Query processing failed with error status", info
+    if data.get("status") == "degraded":
+        analysis = data.get("agent_responses", {}).get("analysis", {})
+        reason = analysis.get("error") or f"low analysis confidence ({analysis.get('confidence', 0)})"
+        return False, f"Query degraded, advisor skipped: {reason}", info
+    if data.get("status") != "completed":
+        return False, f"Unexpected status: {data.get('status')}", info
+    
+    # Verify agent responses
+    agent_responses = data.get("agent_responses", {})
+    missing_agents = _REQUIRED_AGENT_RESPONSES - agent_responses.keys()
+    if missing_agents:
+        return False, f"Missing agent responses: {sorted(missing_agents)}", info
+    
+    # Check translation
+    translation = agent_responses.get("translation", {})
+    info["translation"] = translation
+    if not translation.get("success"):
+        return False, "Translation agent failed", info
+    
+    # Check analysis
+    analysis = agent_responses.get("analysis", {})
+    detected_intent = analysis.get("intent")
+    confidence = analysis.get("confidence", 0)
+    if accepted_intents is not None and detected_intent not in accepted_intents:
+        return False, f"Unexpected intent: {detected_intent}, expected one of {sorted(accepted_intents)}", info
+    
+    # Check advice
+    advice = agent_responses.get("advice", {})
+    if not advice.get("success"):
+        return False, "Agriculture advisor failed", info
+    
+    # Verify recommendations
+    recommendations = data.get("recommendations", [])
+    if not recommendations:
+        return False, "No recommendations provided", info
+    
+    return True, (f"Intent: {detected_intent}, Confidence: {confidence:.2f}, "
+                  f"Recommendations: {len(recommendations)}"), info
 
-print(f"Testing backend at: {API_BASE_URL}")
+def _validate_stored_query(data: Dict[str, Any], query_id: str) -> Tuple[bool, str]:
+    """Check a query document retrieved from /queries/{id}"""
+    missing_fields = _REQ_QUERY - data.keys()
+    if missing_fields:
+        return False, f"Missing fields: {sorted(missing_fields)}"
+    
+    if data.get("id") == query_id:
+        return True, "Query stored and retrieved successfully"
+    
+    return False, f"ID mismatch: expected {query_id}, got {data.get('id')}"
 
 class KrishiOfficerTester:
-    def __init__(self):
+    def __init__(self, base_url: str):
+        self.api_base_url = f"{base_url}/api"
+        # Request URLs are built once rather than formatted per request
+        self._url_health = f"{self.api_base_url}/health"
+        self._url_translate = f"{self.api_base_url}/translate"
+        self._url_query = f"{self.api_base_url}/farmer-query"
+        self._url_query_batch = f"{self.api_base_url}/farmer-query/batch"
+        self._url_queries_tpl = self.api_base_url + "/queries/%s"
         self.session = None
-        self.test_results = []
+        # Results stream to an NDJSON file; only counts, capped failures and the last timestamp stay in memory
+        self._log_fp = None
+        self._counts = collections.Counter()
+        self._failures: List[Dict[str, Any]] = []
+        self._last_timestamp_ns: Optional[int] = None
+        # Print full response bodies of failed tests
+        self.verbose = os.getenv("KRISHI_TEST_VERBOSE", "1") == "1"
+        # (text, source_lang, target_lang) -> future of the (status, body) translate result
+        self._translate_cache: Dict[tuple, asyncio.Future] = {}
+        # Farmer ids are unique per query: run start time plus a sequence number
+        self._run_id = int(time.time())
+        self._seq = itertools.count()
         self.malayalam_queries = [
             {
                 "text": "എന്റെ നെല്ല് വിളയിൽ പുഴുക്കൾ വന്നിട്ടുണ്ട്. എന്ത് ചെയ്യണം?",
                 "description": "Rice crop has worms, what to do?",
-                "expected_intent": "pest_disease"
+                "accepted_intents": frozenset({"pest_disease"})
             },
             {
                 "text": "തെങ്ങിന് എന്ത് വളം ഇടണം?",
                 "description": "What fertilizer for coconut?",
-                "expected_intent": "crop_query"
+                "accepted_intents": frozenset({"crop_query"})
             },
             {
                 "text": "കുരുമുളകിന്റെ രോഗത്തിന് ചികിത്സ എന്താണ്?",
                 "description": "Treatment for pepper disease?",
-                "expected_intent": "pest_disease"
+                "accepted_intents": frozenset({"pest_disease"})
             }
         ]
+        
+        # Pre-serialize the invariant part of each farmer-query body around a farmer_id slot
+        self._farmer_payload_templates = []
+        for query in self.malayalam_queries:
+            encoded = _json_dumps({
+                "text": query["text"],
+                "query_type": "agricultural_support",
+                "location": "Kerala",
+                "farmer_id": "__FID__"
+            })
+            prefix, suffix = encoded.split(b'"__FID__"')
+            self._farmer_payload_templates.append((prefix, suffix))
     
     async def setup(self):
         """Setup test session"""
+        # Cap in-flight requests below the connector limit so fan-out can't starve the pool
+        self.sem = asyncio.Semaphore(int(os.getenv("KRISHI_TEST_CONCURRENCY", "16")))
+        # Separate connect and read budgets so an unreachable backend fails in seconds, not after the total
+        self._timeout = aiohttp.ClientTimeout(total=60, connect=5, sock_connect=5, sock_read=30)
+        # Shorter budget for probes marked "quick"; the farmer-query probe runs the full pipeline
+        self._probe_timeout = aiohttp.ClientTimeout(total=10, sock_connect=5)
+        # One long-lived session (and connection pool) is shared by every test method;
+        # never open per-request sessions, or keep-alive connections can't be reused
         self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=60)
+            connector=aiohttp.TCPConnector(
+                limit=64,
+                limit_per_host=32,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True
+            ),
+            timeout=self._timeout,
+            headers={"Content-Type": "application/json"}
         )
+        self._log_path = os.getenv("KRISHI_TEST_LOG", "test_results.ndjson")
+        self._log_fp = open(self._log_path, "ab")
+        self._probe_methods = {
+            "GET": lambda url, test_case, timeout: self.session.get(url, timeout=timeout),
+            "POST": lambda url, test_case, timeout: self.session.post(url, json=test_case["payload"], timeout=timeout)
+        }
+        await self._warm_pool()
+    
+    async def _warm_pool(self):
+        """Open keep-alive connections with HEAD /health so the first wave of tests skips the handshake"""
+        async def head():
+            try:
+                async with self.session.head(self._url_health, timeout=aiohttp.ClientTimeout(total=3)) as response:
+                    await response.read()
+            except Exception:
+                pass  # Best effort; the real tests report an unreachable backend
+        
+        # Concurrent HEADs each take their own connection
+        await asyncio.gather(*(head() for _ in range(int(os.getenv("KRISHI_POOL_WARM", "1")))))
     
     async def cleanup(self):
         """Cleanup test session"""
         if self.session:
             await self.session.close()
+        if self._log_fp:
+            self._log_fp.close()
+    
+    async def _retry(self, fn, *, attempts: int = 3, base: float = 0.1, retry_on=_TRANSIENT_ERRORS):
+        """Await fn(), retrying retry_on errors with exponential backoff and jitter"""
+        for attempt in range(attempts):
+            try:
+                return await fn()
+            except retry_on:
+                if attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(base * 2 ** attempt + random.random() * base)
+    
+    async def _request(self, make_request, *, idempotent: bool = True) -> Tuple[int, bytes]:
+        """Issue the request built by make_request and return its (status, raw body)
+        
+        Idempotent requests are retried on any transient error, others only on connection failures.
+        """
+        async def attempt():
+            async with make_request() as response:
+                return response.status, await response.read()
+        return await self._retry(attempt, retry_on=_TRANSIENT_ERRORS if idempotent else _CONNECT_ERRORS)
     
     def log_test(self, test_name: str, success: bool, details: str, response_data: Any = None):
         """Log test result"""
@@ -72,196 +314,175 @@ class KrishiOfficerTester:
             "test": test_name,
             "success": success,
             "details": details,
-            "timestamp": datetime.now().isoformat(),
-            "response_data": response_data
+            "timestamp_ns": time.time_ns(),
+            "response_data": _truncate(response_data) if response_data is not None else None
         }
-        self.test_results.append(result)
+        self._log_fp.write(_json_dumps(result) + b"\n")
+        self._counts[success] += 1
+        self._last_timestamp_ns = result["timestamp_ns"]
+        if not success and len(self._failures) < _MAX_FAILURES:
+            self._failures.append(result)
         
-        status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} {test_name}: {details}")
+        print(f"{_PASS_FAIL[success]}{test_name}: {details}")
         
-        if response_data and not success:
-            print(f"   Response: {json.dumps(response_data, indent=2)}")
+        if response_data and not success and self.verbose:
+            print(f"   Response: {_json_pretty(response_data)}")
     
     async def test_health_check(self):
         """Test /api/health endpoint"""
         try:
-            async with self.session.get(f"{API_BASE_URL}/health") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Verify response structure
-                    required_fields = ["status", "service", "timestamp", "agents"]
-                    missing_fields = [field for field in required_fields if field not in data]
-                    
-                    if missing_fields:
-                        self.log_test("Health Check", False, f"Missing fields: {missing_fields}", data)
-                        return False
-                    
-                    # Verify agents are active
-                    agents = data.get("agents", {})
-                    expected_agents = ["translation", "query_understanding", "agriculture_advisor"]
-                    inactive_agents = [agent for agent in expected_agents if agents.get(agent) != "active"]
-                    
-                    if inactive_agents:
-                        self.log_test("Health Check", False, f"Inactive agents: {inactive_agents}", data)
-                        return False
-                    
-                    self.log_test("Health Check", True, "All systems healthy", data)
-                    return True
-                else:
-                    error_text = await response.text()
-                    self.log_test("Health Check", False, f"HTTP {response.status}: {error_text}")
-                    return False
+            status, raw = await self._request(lambda: self.session.get(self._url_health))
+            data = _decode_body(status, raw)
+            
+            if status != 200:
+                self.log_test("Health Check", False, f"HTTP {status}: {data}")
+                return False
+            
+            success, details = _validate_health(data)
+            self.log_test("Health Check", success, details, data)
+            return success
                     
         except Exception as e:
             self.log_test("Health Check", False, f"Exception: {str(e)}")
             return False
     
+    async def _translate(self, text: str, source_lang: str = "ml", target_lang: str = "en"):
+        """POST /translate once per (text, source, target) and share the (status, body) result"""
+        key = (text, source_lang, target_lang)
+        if key in self._translate_cache:
+            return await self._translate_cache[key]
+        
+        # Store the future before awaiting so concurrent callers share the in-flight request
+        future = asyncio.get_running_loop().create_future()
+        self._translate_cache[key] = future
+        try:
+            payload = {
+                "text": text,
+                "source_lang": source_lang,
+                "target_lang": target_lang
+            }
+            
+            async with self.sem:
+                status, raw = await self._request(lambda: self.session.post(self._url_translate, json=payload), idempotent=False)
+            body = _decode_body(status, raw)
+        except Exception as e:
+            del self._translate_cache[key]
+            future.set_exception(e)
+            future.exception()  # mark retrieved; waiters still receive the exception
+            raise
+        
+        future.set_result((status, body))
+        return status, body
+    
+    async def _one_translation(self, query: Dict[str, Any]):
+        """Translate a single query and validate the response"""
+        name = f"Translation - {query['description']}"
+        try:
+            status, data = await self._translate(query["text"])
+            
+            if status != 200:
+                return name, False, f"HTTP {status}: {data}", None
+            
+            success, details = _validate_translation(data)
+            return name, success, details, None if success else data
+                
+        except Exception as e:
+            return name, False, f"Exception: {str(e)}", None
+    
     async def test_translation_endpoint(self):
         """Test /api/translate endpoint"""
-        success_count = 0
         total_tests = len(self.malayalam_queries)
         
-        for query in self.malayalam_queries:
-            try:
-                payload = {
-                    "text": query["text"],
-                    "source_lang": "ml",
-                    "target_lang": "en"
-                }
-                
-                async with self.session.post(
-                    f"{API_BASE_URL}/translate",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Verify response structure
-                        required_fields = ["success", "original_text", "translated_text"]
-                        missing_fields = [field for field in required_fields if field not in data]
-                        
-                        if missing_fields:
-                            self.log_test(f"Translation - {query['description']}", False, 
-                                        f"Missing fields: {missing_fields}", data)
-                            continue
-                        
-                        if data.get("success") and data.get("translated_text"):
-                            self.log_test(f"Translation - {query['description']}", True, 
-                                        f"Translated: '{data['translated_text']}'")
-                            success_count += 1
-                        else:
-                            self.log_test(f"Translation - {query['description']}", False, 
-                                        f"Translation failed: {data.get('error', 'Unknown error')}", data)
-                    else:
-                        error_text = await response.text()
-                        self.log_test(f"Translation - {query['description']}", False, 
-                                    f"HTTP {response.status}: {error_text}")
-                        
-            except Exception as e:
-                self.log_test(f"Translation - {query['description']}", False, f"Exception: {str(e)}")
+        # Queries are independent, so issue them concurrently over the shared session
+        results = await asyncio.gather(*[self._one_translation(query) for query in self.malayalam_queries])
+        
+        success_count = 0
+        for name, success, details, data in results:
+            self.log_test(name, success, details, data)
+            success_count += success
         
         overall_success = success_count == total_tests
         self.log_test("Translation Endpoint Overall", overall_success, 
                      f"{success_count}/{total_tests} translations successful")
         return overall_success
     
+    def _farmer_query_body(self, template) -> bytes:
+        """Fill a pre-serialized farmer-query template with a farmer_id"""
+        prefix, suffix = template
+        return prefix + _json_dumps(f"test_farmer_{self._run_id}_{next(self._seq)}") + suffix
+    
+    async def _submit_farmer_query(self, template):
+        """POST a single farmer query and return its (status, body)"""
+        body = self._farmer_query_body(template)
+        async with self.sem:
+            status, raw = await self._request(lambda: self.session.post(self._url_query, data=body), idempotent=False)
+        return status, _decode_body(status, raw)
+    
+    async def _submit_farmer_query_batch(self):
+        """POST every farmer query in one batch request and split the result into per-query (status, body)"""
+        body = b'{"queries":[' + b",".join(self._farmer_query_body(t) for t in self._farmer_payload_templates) + b"]}"
+        async with self.sem:
+            status, raw = await self._request(lambda: self.session.post(self._url_query_batch, data=body), idempotent=False)
+        data = _decode_body(status, raw)
+        
+        if status != 200:
+            return [(status, data)] * len(self.malayalam_queries)
+        return [(status, item) for item in data]
+    
+    async def _check_farmer_query(self, query: Dict[str, Any], submission):
+        """Validate the multi-agent response to a single farmer query"""
+        name = f"Farmer Query - {query['description']}"
+        query_id = None
+        try:
+            if isinstance(submission, Exception):
+                raise submission
+            status, data = submission
+            
+            if status != 200:
+                return name, False, f"HTTP {status}: {data}", None, query_id
+            
+            success, details, info = _validate_farmer_query(data, query["accepted_intents"])
+            query_id = info["query_id"]
+            if not success:
+                return name, False, details, data, query_id
+            
+            # Cross-check against /translate; memoized, so no extra request after the translation test
+            translate_status, reference = await self._translate(data["original_text"])
+            consistent = translate_status == 200 and reference.get("translated_text") == info["translation"].get("translated_text")
+            
+            return (name, True, 
+                    f"{details}, Translation {'matches' if consistent else 'differs from'} /translate", None, query_id)
+                
+        except Exception as e:
+            return name, False, f"Exception: {str(e)}", None, query_id
+    
     async def test_farmer_query_endpoint(self):
         """Test /api/farmer-query endpoint with multi-agent processing"""
-        success_count = 0
         total_tests = len(self.malayalam_queries)
-        query_ids = []
         
-        for query in self.malayalam_queries:
+        if BATCH_ENDPOINT_ENABLED:
             try:
-                payload = {
-                    "text": query["text"],
-                    "query_type": "agricultural_support",
-                    "location": "Kerala",
-                    "farmer_id": f"test_farmer_{int(time.time())}"
-                }
-                
-                async with self.session.post(
-                    f"{API_BASE_URL}/farmer-query",
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Verify response structure
-                        required_fields = ["id", "original_text", "timestamp", "status"]
-                        missing_fields = [field for field in required_fields if field not in data]
-                        
-                        if missing_fields:
-                            self.log_test(f"Farmer Query - {query['description']}", False, 
-                                        f"Missing fields: {missing_fields}", data)
-                            continue
-                        
-                        query_id = data.get("id")
-                        if query_id:
-                            query_ids.append(query_id)
-                        
-                        # Check if processing was successful
-                        if data.get("status") == "completed":
-                            # Verify agent responses
-                            agent_responses = data.get("agent_responses", {})
-                            expected_agents = ["translation", "analysis", "advice"]
-                            
-                            missing_agents = [agent for agent in expected_agents if agent not in agent_responses]
-                            if missing_agents:
-                                self.log_test(f"Farmer Query - {query['description']}", False, 
-                                            f"Missing agent responses: {missing_agents}", data)
-                                continue
-                            
-                            # Check translation
-                            translation = agent_responses.get("translation", {})
-                            if not translation.get("success"):
-                                self.log_test(f"Farmer Query - {query['description']}", False, 
-                                            "Translation agent failed", data)
-                                continue
-                            
-                            # Check analysis
-                            analysis = agent_responses.get("analysis", {})
-                            detected_intent = analysis.get("intent")
-                            confidence = analysis.get("confidence", 0)
-                            
-                            # Check advice
-                            advice = agent_responses.get("advice", {})
-                            if not advice.get("success"):
-                                self.log_test(f"Farmer Query - {query['description']}", False, 
-                                            "Agriculture advisor failed", data)
-                                continue
-                            
-                            # Verify recommendations
-                            recommendations = data.get("recommendations", [])
-                            if not recommendations:
-                                self.log_test(f"Farmer Query - {query['description']}", False, 
-                                            "No recommendations provided", data)
-                                continue
-                            
-                            self.log_test(f"Farmer Query - {query['description']}", True, 
-                                        f"Intent: {detected_intent}, Confidence: {confidence:.2f}, "
-                                        f"Recommendations: {len(recommendations)}")
-                            success_count += 1
-                            
-                        elif data.get("status") == "error":
-                            self.log_test(f"Farmer Query - {query['description']}", False, 
-                                        f"Query processing failed with error status", data)
-                        else:
-                            self.log_test(f"Farmer Query - {query['description']}", False, 
-                                        f"Unexpected status: {data.get('status')}", data)
-                    else:
-                        error_text = await response.text()
-                        self.log_test(f"Farmer Query - {query['description']}", False, 
-                                    f"HTTP {response.status}: {error_text}")
-                        
+                submissions = await self._submit_farmer_query_batch()
             except Exception as e:
-                self.log_test(f"Farmer Query - {query['description']}", False, f"Exception: {str(e)}")
+                submissions = [e] * total_tests
+        else:
+            submissions = await asyncio.gather(
+                *[self._submit_farmer_query(template) for template in self._farmer_payload_templates],
+                return_exceptions=True
+            )
+        
+        results = await asyncio.gather(*[
+            self._check_farmer_query(query, submission)
+            for query, submission in zip(self.malayalam_queries, submissions)
+        ])
+        
+        success_count = 0
+        query_ids = []
+        for name, success, details, data, query_id in results:
+            self.log_test(name, success, details, data)
+            success_count += success
+            if query_id:
+                query_ids.append(query_id)
         
         overall_success = success_count == total_tests
         self.log_test("Farmer Query Endpoint Overall", overall_success, 
@@ -269,48 +490,51 @@ class KrishiOfficerTester:
         
         return overall_success, query_ids
     
+    async def _one_retrieval(self, query_id: str):
+        """Retrieve a single stored query and validate it"""
+        name = f"Database Retrieval - {query_id}"
+        try:
+            async with self.sem:
+                status, raw = await self._request(lambda: self.session.get(self._url_queries_tpl % query_id))
+            data = _decode_body(status, raw)
+            
+            if status != 200:
+                return name, False, f"HTTP {status}: {data}", None
+            
+            success, details = _validate_stored_query(data, query_id)
+            return name, success, details, None if success else data
+                    
+        except Exception as e:
+            return name, False, f"Exception: {str(e)}", None
+    
     async def test_database_storage(self, query_ids: List[str]):
         """Test database storage by retrieving stored queries"""
         if not query_ids:
             self.log_test("Database Storage", False, "No query IDs to test")
             return False
         
+        results = await asyncio.gather(*[self._one_retrieval(query_id) for query_id in query_ids])
+        
         success_count = 0
-        for query_id in query_ids:
-            try:
-                async with self.session.get(f"{API_BASE_URL}/queries/{query_id}") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Verify stored data structure
-                        required_fields = ["id", "original_text", "timestamp", "status"]
-                        missing_fields = [field for field in required_fields if field not in data]
-                        
-                        if missing_fields:
-                            self.log_test(f"Database Retrieval - {query_id}", False, 
-                                        f"Missing fields: {missing_fields}", data)
-                            continue
-                        
-                        if data.get("id") == query_id:
-                            self.log_test(f"Database Retrieval - {query_id}", True, 
-                                        f"Query stored and retrieved successfully")
-                            success_count += 1
-                        else:
-                            self.log_test(f"Database Retrieval - {query_id}", False, 
-                                        f"ID mismatch: expected {query_id}, got {data.get('id')}")
-                    else:
-                        error_text = await response.text()
-                        self.log_test(f"Database Retrieval - {query_id}", False, 
-                                    f"HTTP {response.status}: {error_text}")
-                        
-            except Exception as e:
-                self.log_test(f"Database Retrieval - {query_id}", False, f"Exception: {str(e)}")
+        for name, success, details, data in results:
+            self.log_test(name, success, details, data)
+            success_count += success
         
         overall_success = success_count == len(query_ids)
         self.log_test("Database Storage Overall", overall_success, 
                      f"{success_count}/{len(query_ids)} queries retrieved successfully")
         return overall_success
     
+    async def _dispatch(self, test_case: Dict[str, Any]):
+        """Issue an error-handling probe with the case's HTTP method and return its (status, body)"""
+        url = f"{self.api_base_url}{test_case['endpoint']}"
+        method = test_case.get("method", "POST")
+        issue = self._probe_methods[method]
+        timeout = self._probe_timeout if test_case.get("quick") else self._timeout
+        async with self.sem:
+            status, raw = await self._request(lambda: issue(url, test_case, timeout), idempotent=method == "GET")
+        return status, raw[:_ERROR_BODY_MAX].decode("utf-8", "replace")
+    
     async def test_error_handling(self):
         """Test error handling with invalid inputs"""
         test_cases = [
@@ -318,7 +542,8 @@ class KrishiOfficerTester:
                 "name": "Empty Translation Request",
                 "endpoint": "/translate",
                 "payload": {"text": "", "source_lang": "ml", "target_lang": "en"},
-                "expected_status": [200, 400]  # Either handled gracefully or rejected
+                "expected_status": [200, 400],  # Either handled gracefully or rejected
+                "quick": True
             },
             {
                 "name": "Invalid Farmer Query",
@@ -330,43 +555,27 @@ class KrishiOfficerTester:
                 "name": "Non-existent Query ID",
                 "endpoint": "/queries/non-existent-id",
                 "method": "GET",
-                "expected_status": [404]
+                "expected_status": [404],
+                "quick": True
             }
         ]
         
+        # Probes are independent, so sweep them concurrently and validate afterwards
+        outcomes = await asyncio.gather(*[self._dispatch(test_case) for test_case in test_cases], return_exceptions=True)
+        
         success_count = 0
-        for test_case in test_cases:
-            try:
-                url = f"{API_BASE_URL}{test_case['endpoint']}"
-                method = test_case.get("method", "POST")
-                
-                if method == "GET":
-                    async with self.session.get(url) as response:
-                        if response.status in test_case["expected_status"]:
-                            self.log_test(f"Error Handling - {test_case['name']}", True, 
-                                        f"Correctly returned HTTP {response.status}")
-                            success_count += 1
-                        else:
-                            error_text = await response.text()
-                            self.log_test(f"Error Handling - {test_case['name']}", False, 
-                                        f"Unexpected status {response.status}: {error_text}")
-                else:
-                    async with self.session.post(
-                        url,
-                        json=test_case["payload"],
-                        headers={"Content-Type": "application/json"}
-                    ) as response:
-                        if response.status in test_case["expected_status"]:
-                            self.log_test(f"Error Handling - {test_case['name']}", True, 
-                                        f"Correctly returned HTTP {response.status}")
-                            success_count += 1
-                        else:
-                            error_text = await response.text()
-                            self.log_test(f"Error Handling - {test_case['name']}", False, 
-                                        f"Unexpected status {response.status}: {error_text}")
-                            
-            except Exception as e:
-                self.log_test(f"Error Handling - {test_case['name']}", False, f"Exception: {str(e)}")
+        for test_case, outcome in zip(test_cases, outcomes):
+            name = f"Error Handling - {test_case['name']}"
+            if isinstance(outcome, Exception):
+                self.log_test(name, False, f"Exception: {str(outcome)}")
+                continue
+            
+            status, body = outcome
+            if status in test_case["expected_status"]:
+                self.log_test(name, True, f"Correctly returned HTTP {status}")
+                success_count += 1
+            else:
+                self.log_test(name, False, f"Unexpected status {status}: {body}")
         
         overall_success = success_count == len(test_cases)
         self.log_test("Error Handling Overall", overall_success, 
@@ -378,26 +587,33 @@ class KrishiOfficerTester:
         print("=" * 80)
         print("DIGITAL KRISHI OFFICER BACKEND TEST SUITE")
         print("=" * 80)
-        print(f"Testing backend at: {API_BASE_URL}")
+        print(f"Testing backend at: {self.api_base_url}")
         print(f"Started at: {datetime.now().isoformat()}")
         print()
         
         await self.setup()
         
         try:
-            # Test 1: Health Check
-            print("1. Testing Health Check Endpoint...")
-            health_ok = await self.test_health_check()
-            print()
-            
-            # Test 2: Translation
-            print("2. Testing Translation Functionality...")
-            translation_ok = await self.test_translation_endpoint()
-            print()
-            
-            # Test 3: Multi-Agent Query Processing
-            print("3. Testing Multi-Agent Query Processing...")
-            query_ok, query_ids = await self.test_farmer_query_endpoint()
+            # Health, translation, multi-agent and error-handling checks are
+            # independent; only database storage needs the created query ids.
+            print("1-3, 5. Testing Health, Translation, Multi-Agent Processing and Error Handling...")
+            if hasattr(asyncio, "TaskGroup"):
+                async with asyncio.TaskGroup() as tg:
+                    t_health = tg.create_task(self.test_health_check())
+                    t_translation = tg.create_task(self.test_translation_endpoint())
+                    t_query = tg.create_task(self.test_farmer_query_endpoint())
+                    t_error = tg.create_task(self.test_error_handling())
+                health_ok = t_health.result()
+                translation_ok = t_translation.result()
+                query_ok, query_ids = t_query.result()
+                error_ok = t_error.result()
+            else:
+                health_ok, translation_ok, (query_ok, query_ids), error_ok = await asyncio.gather(
+                    self.test_health_check(),
+                    self.test_translation_endpoint(),
+                    self.test_farmer_query_endpoint(),
+                    self.test_error_handling(),
+                )
             print()
             
             # Test 4: Database Storage
@@ -405,31 +621,34 @@ class KrishiOfficerTester:
             db_ok = await self.test_database_storage(query_ids)
             print()
             
-            # Test 5: Error Handling
-            print("5. Testing Error Handling...")
-            error_ok = await self.test_error_handling()
-            print()
-            
-            # Summary
-            print("=" * 80)
-            print("TEST SUMMARY")
-            print("=" * 80)
+            # Summary - rendered into one string and written in a single call
+            results = (health_ok, translation_ok, query_ok, db_ok, error_ok)
+            total_tests = len(results)
+            passed_tests = sum(results)
             
-            total_tests = 5
-            passed_tests = sum([health_ok, translation_ok, query_ok, db_ok, error_ok])
-            
-            print(f"Health Check: {'✅ PASS' if health_ok else '❌ FAIL'}")
-            print(f"Translation: {'✅ PASS' if translation_ok else '❌ FAIL'}")
-            print(f"Multi-Agent Processing: {'✅ PASS' if query_ok else '❌ FAIL'}")
-            print(f"Database Storage: {'✅ PASS' if db_ok else '❌ FAIL'}")
-            print(f"Error Handling: {'✅ PASS' if error_ok else '❌ FAIL'}")
-            print()
-            print(f"Overall: {passed_tests}/{total_tests} test suites passed")
+            lines = ["=" * 80, "TEST SUMMARY", "=" * 80]
+            lines.extend(_PASS_FAIL[ok] + name for ok, name in zip(results, _SUITE_NAMES))
+            lines.append("")
+            lines.append(f"Overall: {passed_tests}/{total_tests} test suites passed")
+            lines.append(f"Checks: {self._counts[True]} passed, {self._counts[False]} failed (full results in {self._log_path})")
+            if self._failures:
+                # Concurrent phases interleave their log lines, so repeat the failures here
+                shown = f"first {len(self._failures)}" if self._counts[False] > len(self._failures) else "all"
+                lines.append(f"Failed checks ({shown}):")
+                lines.extend(f"  - {failure['test']}: {failure['details']}" for failure in self._failures)
+            if self._last_timestamp_ns is not None:
+                finished_at = datetime.fromtimestamp(self._last_timestamp_ns / 1e9)
+                lines.append(f"Finished at: {finished_at.isoformat()}")
             
             if passed_tests == total_tests:
-                print("🎉 ALL TESTS PASSED! Backend is working correctly.")
+                lines.append("🎉 ALL TESTS PASSED! Backend is working correctly.")
             else:
-                print("⚠️  Some tests failed. Check details above.")
+                lines.append("⚠️  Some tests failed. Check details above.")
+            
+            # Flush pending print() output first so the summary stays in order
+            sys.stdout.flush()
+            sys.stdout.buffer.write(("\n".join(lines) + "\n").encode())
+            sys.stdout.buffer.flush()
             
             return passed_tests == total_tests
             
@@ -438,10 +657,19 @@ class KrishiOfficerTester:
 
 async def main():
     """Main test runner"""
-    tester = KrishiOfficerTester()
+    tester = KrishiOfficerTester(get_backend_url())
     success = await tester.run_all_tests()
     return success
 
+def _run(coro):
+    """Run coro to completion on uvloop when installed, else on the default event loop"""
+    if uvloop is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 12):
+        return asyncio.run(coro, loop_factory=uvloop.new_event_loop)
+    uvloop.install()
+    return asyncio.run(coro)
+
 if __name__ == "__main__":
-    success = asyncio.run(main())
+    success = _run(main())
     exit(0 if success else 1)
\ No newline at end of file
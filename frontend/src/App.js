@@ -3,6 +3,13 @@ import './App.css';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
 
+// Badge text, badge style and history icon per query status; anything else is still processing
+const STATUS_DISPLAY = {
+  completed: { label: '✅ Completed', badge: 'success', icon: '✅' },
+  degraded: { label: '⚠️ Limited Answer', badge: 'warning', icon: '⚠️' }
+};
+const PROCESSING_DISPLAY = { label: '⏳ Processing', badge: 'success', icon: '⏳' };
+
 function App() {
   const [query, setQuery] = useState('');
   const [location, setLocation] = useState('');
@@ -206,8 +213,8 @@ function App() {
                   <h3>🎯 Agricultural Advice & Analysis</h3>
                   <div className="response-meta">
                     <span className="query-id">ID: {response.id}</span>
-                    <span className="status-badge success">
-                      {response.status === 'completed' ? '✅ Completed' : '⏳ Processing'}
+                    <span className={`status-badge ${(STATUS_DISPLAY[response.status] || PROCESSING_DISPLAY).badge}`}>
+                      {(STATUS_DISPLAY[response.status] || PROCESSING_DISPLAY).label}
                     </span>
                   </div>
                 </div>
@@ -300,7 +307,7 @@ function App() {
                     <div className="history-meta">
                       <span className="history-time">{item.timestamp}</span>
                       <span className={`history-status ${item.status}`}>
-                        {item.status === 'completed' ? '✅' : '⏳'}
+                        {(STATUS_DISPLAY[item.status] || PROCESSING_DISPLAY).icon}
                       </span>
                     </div>
                   </div>
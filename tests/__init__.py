@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend/server.py is a standalone module rather than a package; make it importable as `server`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from pymongo.errors import BulkWriteError
+
+import server
+
+
+class FakeCollection:
+    def __init__(self, error=None, delay=0.0):
+        self.error = error
+        self.delay = delay
+        self.batches = []
+
+    async def bulk_write(self, operations, ordered=True):
+        await asyncio.sleep(self.delay)
+        self.batches.append(list(operations))
+        if self.error:
+            raise self.error
+
+
+class AsyncBatcherTest(unittest.IsolatedAsyncioTestCase):
+    async def test_writes_directly_when_not_started(self):
+        collection = FakeCollection()
+        await server.AsyncBatcher(collection).submit("op")
+        self.assertEqual(collection.batches, [["op"]])
+
+    async def test_concurrent_submits_share_one_bulk_write(self):
+        collection = FakeCollection()
+        batcher = server.AsyncBatcher(collection)
+        batcher.start()
+        await asyncio.gather(*(batcher.submit(f"op{i}") for i in range(3)))
+        await batcher.flush()
+        self.assertEqual(collection.batches, [["op0", "op1", "op2"]])
+
+    async def test_bulk_write_errors_fail_only_their_operations(self):
+        error = BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+        batcher = server.AsyncBatcher(FakeCollection(error=error))
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(f"op{i}") for i in range(3)), return_exceptions=True)
+        await batcher.flush()
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(str(results[1]), "duplicate key")
+        self.assertIsNone(results[2])
+
+    async def test_other_errors_fail_the_whole_batch(self):
+        batcher = server.AsyncBatcher(FakeCollection(error=ConnectionError("down")))
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(f"op{i}") for i in range(2)), return_exceptions=True)
+        await batcher.flush()
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    async def test_flush_completes_an_in_flight_write(self):
+        collection = FakeCollection(delay=0.05)
+        batcher = server.AsyncBatcher(collection)
+        batcher.start()
+        pending = asyncio.create_task(batcher.submit("op"))
+        await asyncio.sleep(0.03)  # drain loop is now inside bulk_write
+        await batcher.flush()
+        await asyncio.wait_for(pending, 1)
+        self.assertEqual(collection.batches, [["op"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import backend_test
+
+
+def farmer_query(**overrides):
+    data = {
+        "id": "q1",
+        "original_text": "തെങ്ങിന് എന്ത് വളം ഇടണം?",
+        "timestamp": "2024-01-01T00:00:00",
+        "status": "completed",
+        "agent_responses": {
+            "translation": {"success": True, "translated_text": "coconut fertilizer"},
+            "analysis": {"intent": "crop_query", "confidence": 0.9},
+            "advice": {"success": True, "advice": "Use compost"}
+        },
+        "recommendations": ["Use compost"]
+    }
+    data.update(overrides)
+    return data
+
+
+class ValidateHealthTest(unittest.TestCase):
+    def test_healthy(self):
+        data = {"status": "healthy", "service": "x", "timestamp": "t",
+                "agents": dict.fromkeys(backend_test._EXPECTED_AGENTS, "active")}
+        self.assertEqual(backend_test._validate_health(data), (True, "All systems healthy"))
+
+    def test_missing_fields_and_inactive_agents(self):
+        self.assertEqual(backend_test._validate_health({"status": "healthy"}),
+                         (False, "Missing fields: ['agents', 'service', 'timestamp']"))
+        data = {"status": "healthy", "service": "x", "timestamp": "t", "agents": {"translation": "active"}}
+        self.assertEqual(backend_test._validate_health(data),
+                         (False, "Inactive agents: ['agriculture_advisor', 'query_understanding']"))
+
+
+class ValidateTranslationTest(unittest.TestCase):
+    def test_success_and_failure(self):
+        ok, _ = backend_test._validate_translation({"success": True, "original_text": "a", "translated_text": "b"})
+        self.assertTrue(ok)
+        ok, details = backend_test._validate_translation(
+            {"success": False, "original_text": "a", "translated_text": None, "error": "boom"})
+        self.assertEqual((ok, details), (False, "Translation failed: boom"))
+
+
+class ValidateFarmerQueryTest(unittest.TestCase):
+    def test_completed_query(self):
+        ok, _, info = backend_test._validate_farmer_query(farmer_query(), frozenset({"crop_query"}))
+        self.assertTrue(ok)
+        self.assertEqual(info["query_id"], "q1")
+        self.assertEqual(info["translation"]["translated_text"], "coconut fertilizer")
+
+    def test_unexpected_intent(self):
+        ok, details, _ = backend_test._validate_farmer_query(farmer_query(), frozenset({"pest_disease"}))
+        self.assertFalse(ok)
+        self.assertTrue(details.startswith("Unexpected intent: crop_query"))
+
+    def test_degraded_query(self):
+        data = farmer_query(status="degraded")
+        data["agent_responses"]["analysis"] = {"intent": "general", "confidence": 0.0, "error": "LLM down"}
+        ok, details, info = backend_test._validate_farmer_query(data)
+        self.assertEqual((ok, details), (False, "Query degraded, advisor skipped: LLM down"))
+        self.assertEqual(info["query_id"], "q1")
+
+    def test_missing_agent_responses(self):
+        data = farmer_query()
+        del data["agent_responses"]["advice"]
+        self.assertEqual(backend_test._validate_farmer_query(data)[:2], (False, "Missing agent responses: ['advice']"))
+
+
+class ValidateStoredQueryTest(unittest.TestCase):
+    def test_id_must_match(self):
+        self.assertTrue(backend_test._validate_stored_query(farmer_query(), "q1")[0])
+        self.assertEqual(backend_test._validate_stored_query(farmer_query(), "q2"),
+                         (False, "ID mismatch: expected q2, got q1"))
+
+
+class TruncateTest(unittest.TestCase):
+    def test_small_payloads_are_kept(self):
+        self.assertEqual(backend_test._truncate({"a": 1}), {"a": 1})
+
+    def test_large_payloads_are_cut(self):
+        truncated = backend_test._truncate("x" * 100, max_bytes=10)
+        self.assertEqual(truncated, "x" * 10 + "...[truncated]")
+
+
+if __name__ == "__main__":
+    unittest.main()
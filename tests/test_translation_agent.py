@@ -0,0 +1,26 @@
+import unittest
+
+import server
+
+
+class ReplaceTermsTest(unittest.TestCase):
+    def setUp(self):
+        self.agent = server.TranslationAgent()
+
+    def test_replaces_lexicon_terms(self):
+        translated, replacements = self.agent._replace_terms("നെല്ല് രോഗം")
+        self.assertEqual(translated, "rice disease")
+        self.assertEqual(replacements, 2)
+
+    def test_leaves_text_without_terms_unchanged(self):
+        self.assertEqual(self.agent._replace_terms("hello"), ("hello", 0))
+
+    def test_prefers_leftmost_then_longest_match(self):
+        self.agent._automaton = server._build_lexicon_automaton({"ab": "X", "abc": "Y", "bcd": "Z", "d": "W"})
+        # "abc" starts first and is longer than "ab"; the overlapping "bcd" is skipped
+        self.assertEqual(self.agent._replace_terms("abcd"), ("YW", 2))
+        self.assertEqual(self.agent._replace_terms("xbcd"), ("xZ", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()